@@ -152,9 +152,14 @@ class CrossEntropySoftmaxError(object):
             Scalar error function value.
         """
 
+        # with log_prob = normalized_outputs - log_sum_exp the per-example
+        # error is sum(targets * normalized_outputs) - log_sum_exp * sum(targets)
+        # so neither log_prob nor its product with targets need be formed
         normalized_outputs = outputs - outputs.max(-1)[:, None]
-        log_prob = normalized_outputs - np.log(np.sum(np.exp(normalized_outputs), axis = -1)[:, None])
-        return - np.mean(np.sum(targets * log_prob, axis=1))
+        log_sum_exp = np.log(np.sum(np.exp(normalized_outputs), axis=-1))
+        return - np.mean(
+            np.einsum('ij,ij->i', targets, normalized_outputs) -
+            log_sum_exp * targets.sum(-1))
 
     def grad(self, outputs, targets):
         """Calculates gradient of error function with respect to outputs.
@@ -167,9 +172,15 @@ class CrossEntropySoftmaxError(object):
             Gradient of error function with respect to outputs.
         """
 
-        probs = np.exp(outputs - outputs.max(-1)[:, None])
+        # softmax and cross entropy gradients combine to probs - targets, so
+        # the gradient is built in the softmax buffer without temporaries
+        probs = np.subtract(outputs, outputs.max(-1)[:, None],
+                            dtype=np.result_type(outputs, np.float32))
+        np.exp(probs, out=probs)
         probs /= probs.sum(-1)[:, None]
-        return (probs - targets) / outputs.shape[0]
+        probs -= targets
+        probs /= outputs.shape[0]
+        return probs
 
     def __repr__(self):
         return 'CrossEntropySoftmaxError'
@@ -12,10 +12,99 @@ methods for getting and setting parameter and calculating gradients with
 respect to the layer parameters.
 """
 
+import math
 import numpy as np
 import mlp.initialisers as init
 from mlp import DEFAULT_SEED
 
+
+def _as_float32(array):
+    """Returns `array` as float32, only copying if it has another dtype."""
+    return array.astype(np.float32, copy=False)
+
+
+# Element-wise activation functions and their gradients, used by the
+# activation layers and (for ReLU and sigmoid) the fused affine-activation
+# layers below. Functions taking an `out` argument may write their result into
+# it (which can be `inputs` itself), otherwise a new float array is allocated.
+
+def _relu(inputs, out=None):
+    """Computes `max(0, x)`."""
+    return np.maximum(inputs, 0., out=out)
+
+
+def _relu_grads(outputs, grads_wrt_outputs):
+    """Maps gradients with respect to ReLU outputs to its inputs."""
+    # select rather than multiply by the mask, so the boolean array is
+    # never cast to float and no multiplication is performed
+    return np.where(outputs > 0, grads_wrt_outputs, 0.)
+
+
+def _sigmoid(inputs, out=None):
+    """Computes `1 / (1 + exp(-x))` as a sequence of in-place operations."""
+    if out is None:
+        out = np.empty(inputs.shape, np.result_type(inputs, np.float32))
+    outputs = np.negative(inputs, out=out)
+    np.exp(outputs, out=outputs)
+    outputs += 1.
+    return np.reciprocal(outputs, out=outputs)
+
+
+def _sigmoid_grads(outputs, grads_wrt_outputs):
+    """Maps gradients with respect to sigmoid outputs to its inputs."""
+    grads_wrt_inputs = 1. - outputs
+    grads_wrt_inputs *= outputs
+    grads_wrt_inputs *= grads_wrt_outputs
+    return grads_wrt_inputs
+
+
+# constants of the GELU tanh approximation, √(2/pi) and the cubic coefficient
+_GELU_A = math.sqrt(2. / math.pi)
+_GELU_B = 0.044715
+
+
+def _gelu_tanh_inner(inputs):
+    """Computes `tanh(√(2/pi)*(x+0.044715*x^3))` in a single buffer."""
+    tanh_inner = np.multiply(
+        inputs, inputs, dtype=np.result_type(inputs, np.float32))
+    tanh_inner *= _GELU_B
+    tanh_inner += 1.
+    tanh_inner *= inputs
+    tanh_inner *= _GELU_A
+    np.tanh(tanh_inner, out=tanh_inner)
+    return tanh_inner
+
+
+def _gelu(inputs):
+    """Computes `0.5*x*(1+tanh(√(2/pi)*(x+0.044715*x^3)))`."""
+    outputs = _gelu_tanh_inner(inputs)
+    outputs += 1.
+    outputs *= inputs
+    outputs *= 0.5
+    return outputs
+
+
+def _gelu_grads(inputs, grads_wrt_outputs):
+    """Maps gradients with respect to GELU outputs to its inputs."""
+    tanh_inner = _gelu_tanh_inner(inputs)
+    # inner_grad = A*x*(1 + 3*B*x^2) = x * d/dx[A*(x + B*x^3)]
+    inner_grad = np.multiply(
+        inputs, inputs, dtype=np.result_type(inputs, np.float32))
+    inner_grad *= 3. * _GELU_B
+    inner_grad += 1.
+    inner_grad *= inputs
+    inner_grad *= _GELU_A
+    # derivative of tanh is sech^2 = 1 - tanh^2
+    grads_wrt_inputs = tanh_inner * tanh_inner
+    np.subtract(1., grads_wrt_inputs, out=grads_wrt_inputs)
+    grads_wrt_inputs *= inner_grad
+    grads_wrt_inputs += tanh_inner
+    grads_wrt_inputs += 1.
+    grads_wrt_inputs *= 0.5
+    grads_wrt_inputs *= grads_wrt_outputs
+    return grads_wrt_inputs
+
+
 class Layer(object):
     """Abstract class defining the interface for a layer."""
 
@@ -68,6 +157,27 @@ class LayerWithParameters(Layer):
         """
         raise NotImplementedError()
 
+    def bprop_and_grads_wrt_params(self, inputs, outputs, grads_wrt_outputs):
+        """Calculates gradients with respect to layer inputs and parameters.
+
+        Equivalent to calling `bprop` and `grads_wrt_params` with the same
+        arguments, but allows layers to share work between the two.
+
+        Args:
+            inputs: Array of layer inputs of shape (batch_size, input_dim).
+            outputs: Array of layer outputs calculated in forward pass of
+                shape (batch_size, output_dim).
+            grads_wrt_outputs: Array of gradients with respect to the layer
+                outputs of shape (batch_size, output_dim).
+
+        Returns:
+            Tuple of the array of gradients with respect to the layer inputs
+            and the list of arrays of gradients with respect to the layer
+            parameters.
+        """
+        return (self.bprop(inputs, outputs, grads_wrt_outputs),
+                self.grads_wrt_params(inputs, grads_wrt_outputs))
+
     def params_penalty(self):
         """Returns the parameter dependent penalty term for this layer.
 
@@ -243,8 +353,14 @@ class AffineLayer(LayerWithParameters):
         """
         self.input_dim = input_dim
         self.output_dim = output_dim
-        self.weights = weights_initialiser((self.output_dim, self.input_dim))
-        self.biases = biases_initialiser(self.output_dim)
+        # weights are stored as (input_dim, output_dim) so that the forward
+        # and gradient products run on C-contiguous operands. Parameters are
+        # kept in single precision, which halves memory traffic and lets
+        # BLAS use sgemm in place of dgemm.
+        self.weights = _as_float32(
+            weights_initialiser((self.input_dim, self.output_dim)))
+        self.biases = _as_float32(biases_initialiser(self.output_dim))
+        self._allocate_grads_buffers()
         self.weights_penalty = weights_penalty
         self.biases_penalty = biases_penalty
 
@@ -252,7 +368,12 @@ class AffineLayer(LayerWithParameters):
         """Forward propagates activations through the layer transformation.
 
         For inputs `x`, outputs `y`, weights `W` and biases `b` the layer
-        corresponds to `y = W.dot(x) + b`.
+        corresponds to `y = x.dot(W) + b`.
+
+        The batch dimension is not limited to the training batch size: at
+        inference time a whole dataset can be passed in a single call, which
+        computes all outputs with one matrix product rather than one per
+        minibatch.
 
         Args:
             inputs: Array of layer inputs of shape (batch_size, input_dim).
@@ -260,7 +381,11 @@ class AffineLayer(LayerWithParameters):
         Returns:
             outputs: Array of layer outputs of shape (batch_size, output_dim).
         """
-        return self.weights.dot(inputs.T).T + self.biases
+        # the product allocates the output once and the bias is added into
+        # it in place; this also handles a single 1-D input vector
+        outputs = np.dot(_as_float32(inputs), self.weights)
+        outputs += self.biases
+        return outputs
 
     def bprop(self, inputs, outputs, grads_wrt_outputs):
         """Back propagates gradients through a layer.
@@ -279,7 +404,7 @@ class AffineLayer(LayerWithParameters):
             Array of gradients with respect to the layer inputs of shape
             (batch_size, input_dim).
         """
-        return grads_wrt_outputs.dot(self.weights)
+        return _as_float32(grads_wrt_outputs).dot(self.weights.T)
 
     def grads_wrt_params(self, inputs, grads_wrt_outputs):
         """Calculates gradients with respect to layer parameters.
@@ -291,13 +416,20 @@ class AffineLayer(LayerWithParameters):
 
         Returns:
             list of arrays of gradients with respect to the layer parameters
-            `[grads_wrt_weights, grads_wrt_biases]`.
+            `[grads_wrt_weights, grads_wrt_biases]`. These arrays are buffers
+            owned by the layer which are overwritten on the next call, so
+            callers should copy them if they need to be retained.
         """
-        
-        grads_wrt_weights = np.dot(grads_wrt_outputs.T, inputs)
-        grads_wrt_biases = np.sum(grads_wrt_outputs, axis=0)
-        
-        return [grads_wrt_weights, grads_wrt_biases]
+        inputs = _as_float32(inputs)
+        grads_wrt_outputs = _as_float32(grads_wrt_outputs)
+        np.dot(inputs.T, grads_wrt_outputs, out=self._grads_wrt_weights)
+        np.sum(grads_wrt_outputs, axis=0, out=self._grads_wrt_biases)
+        return [self._grads_wrt_weights, self._grads_wrt_biases]
+
+    def _allocate_grads_buffers(self):
+        """Allocates the arrays `grads_wrt_params` writes gradients into."""
+        self._grads_wrt_weights = np.empty_like(self.weights)
+        self._grads_wrt_biases = np.empty_like(self.biases)
 
     def params_penalty(self):
         """Returns the parameter dependent penalty term for this layer.
@@ -309,13 +441,25 @@ class AffineLayer(LayerWithParameters):
 
     @property
     def params(self):
-        """A list of layer parameter values: `[weights, biases]`."""
+        """A list of layer parameter values: `[weights, biases]`.
+
+        The weights have shape (input_dim, output_dim) and the biases shape
+        (output_dim,).
+        """
         return [self.weights, self.biases]
 
     @params.setter
     def params(self, values):
-        self.weights = values[0]
-        self.biases = values[1]
+        assert values[0].shape == (self.input_dim, self.output_dim), (
+            'Weights should have shape (input_dim, output_dim) = {0}, '
+            'got {1}.'.format((self.input_dim, self.output_dim),
+                              values[0].shape))
+        assert values[1].shape == (self.output_dim,), (
+            'Biases should have shape (output_dim,) = {0}, got {1}.'.format(
+                (self.output_dim,), values[1].shape))
+        self.weights = _as_float32(values[0])
+        self.biases = _as_float32(values[1])
+        self._allocate_grads_buffers()
 
     def __repr__(self):
         return 'AffineLayer(input_dim={0}, output_dim={1})'.format(
@@ -337,7 +481,7 @@ class SigmoidLayer(Layer):
         Returns:
             outputs: Array of layer outputs of shape (batch_size, output_dim).
         """
-        return 1. / (1. + np.exp(-inputs))
+        return _sigmoid(inputs)
 
     def bprop(self, inputs, outputs, grads_wrt_outputs):
         """Back propagates gradients through a layer.
@@ -356,7 +500,7 @@ class SigmoidLayer(Layer):
             Array of gradients with respect to the layer inputs of shape
             (batch_size, input_dim).
         """
-        return grads_wrt_outputs * outputs * (1. - outputs)
+        return _sigmoid_grads(outputs, grads_wrt_outputs)
 
     def __repr__(self):
         return 'SigmoidLayer'
@@ -394,7 +538,10 @@ class TanhLayer(Layer):
             Array of gradients with respect to the layer inputs of shape
             (batch_size, input_dim).
         """
-        return (1. - outputs**2) * grads_wrt_outputs
+        grads_wrt_inputs = outputs * outputs
+        np.subtract(1., grads_wrt_inputs, out=grads_wrt_inputs)
+        grads_wrt_inputs *= grads_wrt_outputs
+        return grads_wrt_inputs
 
     def __repr__(self):
         return 'TanhLayer'
@@ -418,8 +565,11 @@ class SoftmaxLayer(Layer):
         """
         # subtract max inside exponential to improve numerical stability -
         # when we divide through by sum this term cancels
-        exp_inputs = np.exp(inputs - inputs.max(-1)[:, None])
-        return exp_inputs / exp_inputs.sum(-1)[:, None]
+        outputs = np.subtract(inputs, inputs.max(-1)[:, None],
+                              dtype=np.result_type(inputs, np.float32))
+        np.exp(outputs, out=outputs)
+        outputs /= outputs.sum(-1)[:, None]
+        return outputs
 
     def bprop(self, inputs, outputs, grads_wrt_outputs):
         """Back propagates gradients through a layer.
@@ -438,7 +588,12 @@ class SoftmaxLayer(Layer):
             Array of gradients with respect to the layer inputs of shape
             (batch_size, input_dim).
         """
-        return outputs * (grads_wrt_outputs - (grads_wrt_outputs * outputs).sum(-1)[:, None])
+        # row-wise dot product of gradients and outputs without materialising
+        # the intermediate (batch_size, output_dim) product
+        grads_dot_outputs = np.einsum('ij,ij->i', grads_wrt_outputs, outputs)
+        grads_wrt_inputs = grads_wrt_outputs - grads_dot_outputs[:, None]
+        grads_wrt_inputs *= outputs
+        return grads_wrt_inputs
 
     def __repr__(self):
         return 'SoftmaxLayer'
@@ -465,6 +620,9 @@ class ReshapeLayer(Layer):
                 which will flatten all the inputs to vectors.
         """
         self.output_shape = (-1,) if output_shape is None else output_shape
+        # shape of the inputs in the last forward pass, so that `bprop` does
+        # not need the inputs array itself to be kept alive
+        self._inputs_shape = None
 
     def fprop(self, inputs):
         """Forward propagates activations through the layer transformation.
@@ -475,6 +633,7 @@ class ReshapeLayer(Layer):
         Returns:
             outputs: Array of layer outputs of shape (batch_size, output_dim).
         """
+        self._inputs_shape = inputs.shape
         return inputs.reshape((inputs.shape[0],) + self.output_shape)
 
     def bprop(self, inputs, outputs, grads_wrt_outputs):
@@ -485,6 +644,8 @@ class ReshapeLayer(Layer):
 
         Args:
             inputs: Array of layer inputs of shape (batch_size, input_dim).
+                Unused, as the input shape recorded in the last call to
+                `fprop` is used instead, so it may be `None`.
             outputs: Array of layer outputs calculated in forward pass of
                 shape (batch_size, output_dim).
             grads_wrt_outputs: Array of gradients with respect to the layer
@@ -494,7 +655,7 @@ class ReshapeLayer(Layer):
             Array of gradients with respect to the layer inputs of shape
             (batch_size, input_dim).
         """
-        return grads_wrt_outputs.reshape(inputs.shape)
+        return grads_wrt_outputs.reshape(self._inputs_shape)
 
     def __repr__(self):
         return 'ReshapeLayer(output_shape={0})'.format(self.output_shape)
@@ -514,7 +675,7 @@ class ReluLayer(Layer):
         Returns:
             outputs: Array of layer outputs of shape (batch_size, output_dim).
         """
-        return np.maximum(inputs, 0.)
+        return _relu(inputs)
 
     def bprop(self, inputs, outputs, grads_wrt_outputs):
         """Back propagates gradients through a layer.
@@ -533,8 +694,7 @@ class ReluLayer(Layer):
             Array of gradients with respect to the layer inputs of shape
             (batch_size, input_dim).
         """
-        #print('relu',grads_wrt_outputs,outputs)
-        return (outputs > 0) * grads_wrt_outputs
+        return _relu_grads(outputs, grads_wrt_outputs)
 
     def __repr__(self):
         return 'ReluLayer'
@@ -557,7 +717,13 @@ class EluLayer(Layer):
         Returns:
             outputs: Array of layer outputs of shape (batch_size, output_dim).
         """
-        return ((inputs >= 0)*inputs + (inputs < 0) * self.alpha*(np.exp(inputs) - 1))
+        # start from y = x and only evaluate the exponential branch where
+        # x < 0, which also avoids overflow for large positive inputs
+        negative = inputs < 0
+        outputs = inputs.astype(np.result_type(inputs, np.float32))
+        np.expm1(inputs, out=outputs, where=negative)
+        np.multiply(outputs, self.alpha, out=outputs, where=negative)
+        return outputs
 
     def bprop(self, inputs, outputs, grads_wrt_outputs):
         """Back propagates gradients through a layer.
@@ -576,8 +742,16 @@ class EluLayer(Layer):
             Array of gradients with respect to the layer inputs of shape
             (batch_size, input_dim).
         """
-        
-        return grads_wrt_outputs*(inputs > 0) + (inputs<0)*self.alpha * np.exp(inputs) * grads_wrt_outputs
+        # start from the unit derivative of the x >= 0 branch and only
+        # evaluate alpha*exp(x) where x < 0
+        negative = inputs < 0
+        grads_wrt_inputs = np.ones(
+            inputs.shape, np.result_type(inputs, np.float32))
+        np.exp(inputs, out=grads_wrt_inputs, where=negative)
+        np.multiply(grads_wrt_inputs, self.alpha, out=grads_wrt_inputs,
+                    where=negative)
+        grads_wrt_inputs *= grads_wrt_outputs
+        return grads_wrt_inputs
 
     def __repr__(self):
         return 'EluLayer'
@@ -601,7 +775,12 @@ class SeluLayer(Layer):
         Returns:
             outputs: Array of layer outputs of shape (batch_size, output_dim).
         """
-        return ((self.scale*inputs*(inputs >= 0)) + (inputs < 0*self.scale*self.alpha*(np.exp(inputs) - 1)))
+        negative = inputs < 0
+        outputs = inputs.astype(np.result_type(inputs, np.float32))
+        np.expm1(inputs, out=outputs, where=negative)
+        np.multiply(outputs, self.alpha, out=outputs, where=negative)
+        outputs *= self.scale
+        return outputs
 
     def bprop(self, inputs, outputs, grads_wrt_outputs):
         """Back propagates gradients through a layer.
@@ -620,7 +799,17 @@ class SeluLayer(Layer):
             Array of gradients with respect to the layer inputs of shape
             (batch_size, input_dim).
         """
-        return ((self.scale*grads_wrt_outputs*(inputs > 0)) + (self.scale*(inputs<0)*self.alpha * np.exp(inputs) * grads_wrt_outputs))
+        # start from the unit derivative of the x >= 0 branch and only
+        # evaluate alpha*exp(x) where x < 0, then apply the scale throughout
+        negative = inputs < 0
+        grads_wrt_inputs = np.ones(
+            inputs.shape, np.result_type(inputs, np.float32))
+        np.exp(inputs, out=grads_wrt_inputs, where=negative)
+        np.multiply(grads_wrt_inputs, self.alpha, out=grads_wrt_inputs,
+                    where=negative)
+        grads_wrt_inputs *= self.scale
+        grads_wrt_inputs *= grads_wrt_outputs
+        return grads_wrt_inputs
      
     def __repr__(self):
         return 'SeluLayer'
@@ -638,7 +827,7 @@ class GeluLayer(Layer):
         Returns:
             outputs: Array of layer outputs of shape (batch_size, output_dim).
         """
-        return 0.5*inputs*(1 + np.tanh(np.sqrt(2/np.pi)*(inputs + 0.044715*inputs**3)))
+        return _gelu(inputs)
 
     def bprop(self, inputs, outputs, grads_wrt_outputs):
         """Back propagates gradients through a layer.
@@ -657,10 +846,7 @@ class GeluLayer(Layer):
             Array of gradients with respect to the layer inputs of shape
             (batch_size, input_dim).
         """
-            
-        a = np.sqrt(2/np.pi)
-        return grads_wrt_outputs*0.5*(1 + np.tanh(a*(inputs + 0.044715*inputs**3)) + (a*inputs*(1 + 0.134145*inputs**2) * 1/(np.cosh(a*(inputs + 0.044715*inputs**3)))))
-        
+        return _gelu_grads(inputs, grads_wrt_outputs)
 
     def __repr__(self):
         return 'GeluLayer'
@@ -671,6 +857,19 @@ class IsreluLayer(Layer):
     """Layer implementing an element-wise inverse square root linear unit transformation(ISRLU)""" 
     def __init__(self, alpha):
         self.alpha = alpha
+
+    def _inv_sqrt(self, inputs, where):
+        """Computes `1/√(1+αx^2)` into a new float array.
+
+        Only elements selected by the boolean array `where` are computed, the
+        remaining elements of the returned buffer are left undefined.
+        """
+        inv_sqrt = np.empty(inputs.shape, np.result_type(inputs, np.float32))
+        np.multiply(inputs, inputs, out=inv_sqrt, where=where)
+        np.multiply(inv_sqrt, self.alpha, out=inv_sqrt, where=where)
+        np.add(inv_sqrt, 1., out=inv_sqrt, where=where)
+        np.sqrt(inv_sqrt, out=inv_sqrt, where=where)
+        return np.reciprocal(inv_sqrt, out=inv_sqrt, where=where)
     
     def fprop(self, inputs):
         """Forward propagates through the inverse square root linear unit layer transformation.
@@ -697,7 +896,11 @@ class IsreluLayer(Layer):
             outputs: Array of layer outputs of shape (batch_size, output_dim).
         
         """
-        return ((inputs >= 0)*inputs + (inputs < 0) * (1/np.sqrt(1+self.alpha*inputs**2)))
+        negative = inputs < 0
+        inv_sqrt = self._inv_sqrt(inputs, negative)
+        outputs = inputs.astype(np.result_type(inputs, np.float32))
+        np.multiply(inputs, inv_sqrt, out=outputs, where=negative)
+        return outputs
 
     
     def bprop(self, inputs, outputs, grads_wrt_outputs):
@@ -719,7 +922,169 @@ class IsreluLayer(Layer):
             (batch_size, input_dim).
         
         """
-        return grads_wrt_outputs*(inputs > 0) + (inputs<0)* grads_wrt_outputs*(1/np.sqrt(1+self.alpha*inputs**2))**3
+        # for x < 0 the outputs are y = x/√(1+αx^2) so the inverse square root
+        # is recovered as y/x without another square root; the positive
+        # elements keep the initial value of one, giving unit derivative
+        inv_sqrt = np.ones(inputs.shape, np.result_type(inputs, np.float32))
+        np.divide(outputs, inputs, out=inv_sqrt, where=inputs < 0)
+        grads_wrt_inputs = inv_sqrt * inv_sqrt
+        grads_wrt_inputs *= inv_sqrt
+        grads_wrt_inputs *= grads_wrt_outputs
+        return grads_wrt_inputs
         #return grads_wrt_outputs if inputs >= 0 else grads_wrt_outputs*(1/np.sqrt(1+self.alpha*inputs**2))**3
     def __repr__(self):
-        return 'IsreluLayer'
\ No newline at end of file
+        return 'IsreluLayer'
+
+
+class FusedAffineLayer(AffineLayer):
+    """Abstract affine layer with an element-wise activation fused into it.
+
+    The activation is applied to the affine outputs in place, so the
+    pre-activations are not written out and read back as a separate
+    activation array as they are when an `AffineLayer` is followed by an
+    activation layer. Subclasses define the activation by implementing
+    `_activation_fprop` and `_activation_bprop`, the latter of which may only
+    depend on the layer outputs.
+
+    The parameter gradients depend on the gradients with respect to the
+    pre-activations, which `bprop_and_grads_wrt_params` computes once for
+    both the input and parameter gradients. Calling `grads_wrt_params` on
+    its own has to recompute the layer outputs from the inputs.
+    """
+
+    def _activation_fprop(self, pre_activations):
+        """Applies the activation, possibly overwriting `pre_activations`.
+
+        Args:
+            pre_activations: Array of affine outputs of shape
+                (batch_size, output_dim).
+
+        Returns:
+            outputs: Array of layer outputs of shape (batch_size, output_dim).
+        """
+        raise NotImplementedError()
+
+    def _activation_bprop(self, outputs, grads_wrt_outputs):
+        """Back propagates gradients through the activation only.
+
+        Args:
+            outputs: Array of layer outputs calculated in forward pass of
+                shape (batch_size, output_dim).
+            grads_wrt_outputs: Array of gradients with respect to the layer
+                outputs of shape (batch_size, output_dim).
+
+        Returns:
+            Array of gradients with respect to the pre-activations of shape
+            (batch_size, output_dim).
+        """
+        raise NotImplementedError()
+
+    def fprop(self, inputs):
+        """Forward propagates activations through the layer transformation.
+
+        Args:
+            inputs: Array of layer inputs of shape (batch_size, input_dim).
+
+        Returns:
+            outputs: Array of layer outputs of shape (batch_size, output_dim).
+        """
+        return self._activation_fprop(AffineLayer.fprop(self, inputs))
+
+    def bprop(self, inputs, outputs, grads_wrt_outputs):
+        """Back propagates gradients through a layer.
+
+        Given gradients with respect to the outputs of the layer calculates the
+        gradients with respect to the layer inputs.
+
+        Args:
+            inputs: Array of layer inputs of shape (batch_size, input_dim).
+            outputs: Array of layer outputs calculated in forward pass of
+                shape (batch_size, output_dim).
+            grads_wrt_outputs: Array of gradients with respect to the layer
+                outputs of shape (batch_size, output_dim).
+
+        Returns:
+            Array of gradients with respect to the layer inputs of shape
+            (batch_size, input_dim).
+        """
+        grads_wrt_pre_activations = self._activation_bprop(
+            outputs, grads_wrt_outputs)
+        return AffineLayer.bprop(
+            self, inputs, outputs, grads_wrt_pre_activations)
+
+    def grads_wrt_params(self, inputs, grads_wrt_outputs):
+        """Calculates gradients with respect to layer parameters.
+
+        As the outputs are not passed in they are recomputed from the inputs;
+        use `bprop_and_grads_wrt_params` to avoid this when they are known.
+
+        Args:
+            inputs: array of inputs to layer of shape (batch_size, input_dim)
+            grads_wrt_to_outputs: array of gradients with respect to the layer
+                outputs of shape (batch_size, output_dim)
+
+        Returns:
+            list of arrays of gradients with respect to the layer parameters
+            `[grads_wrt_weights, grads_wrt_biases]`. These arrays are buffers
+            owned by the layer which are overwritten on the next call, so
+            callers should copy them if they need to be retained.
+        """
+        grads_wrt_pre_activations = self._activation_bprop(
+            self.fprop(inputs), grads_wrt_outputs)
+        return AffineLayer.grads_wrt_params(
+            self, inputs, grads_wrt_pre_activations)
+
+    def bprop_and_grads_wrt_params(self, inputs, outputs, grads_wrt_outputs):
+        """Calculates gradients with respect to layer inputs and parameters.
+
+        The gradients with respect to the pre-activations are computed once
+        and used for both.
+
+        Args:
+            inputs: Array of layer inputs of shape (batch_size, input_dim).
+            outputs: Array of layer outputs calculated in forward pass of
+                shape (batch_size, output_dim).
+            grads_wrt_outputs: Array of gradients with respect to the layer
+                outputs of shape (batch_size, output_dim).
+
+        Returns:
+            Tuple of the array of gradients with respect to the layer inputs
+            and the list of arrays of gradients with respect to the layer
+            parameters `[grads_wrt_weights, grads_wrt_biases]`.
+        """
+        grads_wrt_pre_activations = self._activation_bprop(
+            outputs, grads_wrt_outputs)
+        return (
+            AffineLayer.bprop(self, inputs, outputs, grads_wrt_pre_activations),
+            AffineLayer.grads_wrt_params(
+                self, inputs, grads_wrt_pre_activations))
+
+
+class AffineReluLayer(FusedAffineLayer):
+    """Affine transformation followed by an element-wise rectified linear
+    transformation, equivalent to an `AffineLayer` and `ReluLayer` pair."""
+
+    def _activation_fprop(self, pre_activations):
+        return _relu(pre_activations, out=pre_activations)
+
+    def _activation_bprop(self, outputs, grads_wrt_outputs):
+        return _relu_grads(outputs, grads_wrt_outputs)
+
+    def __repr__(self):
+        return 'AffineReluLayer(input_dim={0}, output_dim={1})'.format(
+            self.input_dim, self.output_dim)
+
+
+class AffineSigmoidLayer(FusedAffineLayer):
+    """Affine transformation followed by an element-wise logistic sigmoid
+    transformation, equivalent to an `AffineLayer` and `SigmoidLayer` pair."""
+
+    def _activation_fprop(self, pre_activations):
+        return _sigmoid(pre_activations, out=pre_activations)
+
+    def _activation_bprop(self, outputs, grads_wrt_outputs):
+        return _sigmoid_grads(outputs, grads_wrt_outputs)
+
+    def __repr__(self):
+        return 'AffineSigmoidLayer(input_dim={0}, output_dim={1})'.format(
+            self.input_dim, self.output_dim)
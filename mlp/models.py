@@ -89,6 +89,8 @@ class MultipleLayerModel(object):
 
         Args:
             inputs: Batch of inputs to the model.
+            evaluation: If True stochastic layers use their deterministic
+                forward-propagation mode (e.g. for use at test time).
 
         Returns:
             List of the activations at the output of all layers of the model
@@ -96,19 +98,12 @@ class MultipleLayerModel(object):
             last element of the list corresponds to the model outputs.
         """
         activations = [inputs]
-        for i, layer in enumerate(self.layers):
-            if evaluation:
-                if issubclass(type(self.layers[i]), StochasticLayer) or issubclass(type(self.layers[i]),
-                                                                                   StochasticLayerWithParameters):
-                    current_activations = self.layers[i].fprop(activations[i], stochastic=False)
-                else:
-                    current_activations = self.layers[i].fprop(activations[i])
+        for layer in self.layers:
+            if isinstance(layer, (StochasticLayer, StochasticLayerWithParameters)):
+                current_activations = layer.fprop(
+                    activations[-1], stochastic=not evaluation)
             else:
-                if issubclass(type(self.layers[i]), StochasticLayer) or issubclass(type(self.layers[i]),
-                                                                                   StochasticLayerWithParameters):
-                    current_activations = self.layers[i].fprop(activations[i], stochastic=True)
-                else:
-                    current_activations = self.layers[i].fprop(activations[i])
+                current_activations = layer.fprop(activations[-1])
             activations.append(current_activations)
         return activations
 
@@ -130,10 +125,17 @@ class MultipleLayerModel(object):
         for i, layer in enumerate(self.layers[::-1]):
             inputs = activations[-i - 2]
             outputs = activations[-i - 1]
-            grads_wrt_inputs = layer.bprop(inputs, outputs, grads_wrt_outputs)
-            if isinstance(layer, LayerWithParameters) or isinstance(layer, StochasticLayerWithParameters):
-                grads_wrt_params += layer.grads_wrt_params(
-                    inputs, grads_wrt_outputs)[::-1]
+            if isinstance(layer, LayerWithParameters):
+                grads_wrt_inputs, layer_grads_wrt_params = (
+                    layer.bprop_and_grads_wrt_params(
+                        inputs, outputs, grads_wrt_outputs))
+                grads_wrt_params += layer_grads_wrt_params[::-1]
+            else:
+                grads_wrt_inputs = layer.bprop(
+                    inputs, outputs, grads_wrt_outputs)
+                if isinstance(layer, StochasticLayerWithParameters):
+                    grads_wrt_params += layer.grads_wrt_params(
+                        inputs, grads_wrt_outputs)[::-1]
             grads_wrt_outputs = grads_wrt_inputs
         return grads_wrt_params[::-1]
 